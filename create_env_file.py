@@ -71,9 +71,7 @@ def test_config():
     """בדיקת הconfig הנוכחי"""
     print("🔍 בדיקת Config נוכחי...")
     try:
-        import sys
-        sys.path.append('shared')
-        from config import print_config_status
+        from shared.config import print_config_status
         print_config_status()
         return True
     except Exception as e:
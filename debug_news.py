@@ -3,70 +3,92 @@
 סקריפט אבחון לבדיקת News Analyzer
 """
 
-import sys
-import os
 import requests
 import redis
-import json
-from datetime import datetime
+import msgpack
+import time
+from concurrent.futures import ThreadPoolExecutor
+from prometheus_client.parser import text_string_to_metric_families
 
-sys.path.append(os.path.join(os.path.dirname(__file__), 'shared'))
 from shared.config import settings
+from shared.models import now_ms
+from shared.pubsub import MSGPACK_TAG, decode_message, get_connection_pool
+
+SERVICE_ENDPOINTS = [
+    ("Market Scanner", "http://localhost:5000/health"),
+    ("News Analyzer", "http://localhost:5001/health"),
+]
+
+def _probe_service(endpoint):
+    """בדיקת health של שירות אחד"""
+    name, url = endpoint
+    try:
+        return name, requests.get(url, timeout=5)
+    except requests.RequestException:
+        return name, None
 
 def check_services():
     """בדוק שכל השירותים רצים"""
     print("🔍 בודק שירותים...")
     
-    # Market Scanner
-    try:
-        response = requests.get("http://localhost:5000/health", timeout=5)
-        if response.status_code == 200:
-            print("✅ Market Scanner רץ")
-        else:
-            print(f"❌ Market Scanner לא תקין: {response.status_code}")
-    except:
-        print("❌ Market Scanner לא רץ")
+    # כל הבדיקות נשלחות במקביל - זמן כולל של בקשה אחת
+    with ThreadPoolExecutor(max_workers=len(SERVICE_ENDPOINTS)) as executor:
+        results = list(executor.map(_probe_service, SERVICE_ENDPOINTS))
     
-    # News Analyzer
-    try:
-        response = requests.get("http://localhost:5001/health", timeout=5)
-        if response.status_code == 200:
-            print("✅ News Analyzer רץ")
+    for name, response in results:
+        if response is None:
+            print(f"❌ {name} לא רץ")
+        elif response.status_code == 200:
+            print(f"✅ {name} רץ")
         else:
-            print(f"❌ News Analyzer לא תקין: {response.status_code}")
-    except:
-        print("❌ News Analyzer לא רץ")
+            print(f"❌ {name} לא תקין: {response.status_code}")
 
 def check_redis():
     """בדוק Redis connection"""
     print("\n🔍 בודק Redis...")
     
     try:
-        r = redis.Redis.from_url(settings.redis_url)
+        r = redis.Redis(connection_pool=get_connection_pool(settings.redis_url))
         r.ping()
         print("✅ Redis connection עובד")
         
         # בדוק messages שנשלחו
-        pubsub = r.pubsub()
-        pubsub.psubscribe("*")
+        def print_message(message):
+            try:
+                data = decode_message(message['data'])
+            except ValueError:
+                data = message['data']
+            print(f"📨 הודעה בערוץ {message['channel'].decode()}: {str(data)[:100]}...")
+        
+        pubsub = r.pubsub(ignore_subscribe_messages=True)
+        pubsub.psubscribe(**{"*": print_message})
         print("📡 מאזין להודעות ב-Redis (לחץ Ctrl+C להפסיק)...")
         
-        # האזן ל-5 שניות
-        import time
-        start_time = time.time()
-        while time.time() - start_time < 5:
-            message = pubsub.get_message(timeout=1)
-            if message and message['type'] == 'pmessage':
-                channel = message['channel']
-                data = message['data']
-                print(f"📨 הודעה בערוץ {channel}: {data[:100]}...")
+        # האזן ל-5 שניות - ה-thread מטפל בהודעות רק כשהן מגיעות
+        listener = pubsub.run_in_thread(sleep_time=1.0, daemon=True)
+        try:
+            time.sleep(5)
+        finally:
+            listener.stop()
+            listener.join(timeout=1)
+            pubsub.close()
         
         print("⏰ סיימתי להאזין")
         
     except Exception as e:
         print(f"❌ Redis connection נכשל: {e}")
 
-def check_finnhub_api():
+def _fetch_finnhub_news(session, symbol):
+    """קריאת חדשות Finnhub עבור סמל אחד"""
+    url = "https://finnhub.io/api/v1/company-news"
+    params = {
+        'symbol': symbol,
+        'from': '2025-01-14',
+        'to': '2025-01-15'
+    }
+    return symbol, session.get(url, params=params, timeout=10)
+
+def check_finnhub_api(symbols=("AAPL", "TSLA", "MSFT")):
     """בדוק Finnhub API"""
     print("\n🔍 בודק Finnhub API...")
     
@@ -75,43 +97,42 @@ def check_finnhub_api():
         return
     
     try:
-        url = "https://finnhub.io/api/v1/company-news"
-        headers = {'X-Finnhub-Token': settings.finnhub_api_key}
-        params = {
-            'symbol': 'AAPL',
-            'from': '2025-01-14',
-            'to': '2025-01-15'
-        }
-        
-        response = requests.get(url, headers=headers, params=params, timeout=10)
+        # Session אחד לכל הבקשות - כל הסמלים נשלחים במקביל
+        with requests.Session() as session:
+            session.headers.update({'X-Finnhub-Token': settings.finnhub_api_key})
+            
+            with ThreadPoolExecutor(max_workers=len(symbols)) as executor:
+                results = list(executor.map(lambda symbol: _fetch_finnhub_news(session, symbol), symbols))
         
-        if response.status_code == 200:
-            news_data = response.json()
-            print(f"✅ Finnhub API עובד - {len(news_data)} חדשות עבור AAPL")
-        elif response.status_code == 401:
-            print("❌ Finnhub API key לא תקין")
-        else:
-            print(f"❌ Finnhub API error: {response.status_code}")
+        for symbol, response in results:
+            if response.status_code == 200:
+                news_data = response.json()
+                print(f"✅ Finnhub API עובד - {len(news_data)} חדשות עבור {symbol}")
+            elif response.status_code == 401:
+                print("❌ Finnhub API key לא תקין")
+                return
+            else:
+                print(f"❌ Finnhub API error עבור {symbol}: {response.status_code}")
             
     except Exception as e:
         print(f"❌ Finnhub API נכשל: {e}")
 
-def send_test_event():
+def send_test_event(timestamp_ms=None):
     """שלח market event לבדיקה"""
     print("\n🧪 שולח market event לבדיקה...")
     
     try:
-        r = redis.Redis.from_url(settings.redis_url)
+        r = redis.Redis(connection_pool=get_connection_pool(settings.redis_url))
         
         test_event = {
             "symbol": "TSLA",
             "price": 250.0,
             "change_percent": 8.5,
             "volume": 2000000,
-            "timestamp": datetime.now().isoformat()
+            "timestamp_ms": timestamp_ms or now_ms()
         }
         
-        result = r.publish('market_events', json.dumps(test_event))
+        result = r.publish('market_events', MSGPACK_TAG + msgpack.packb(test_event, use_bin_type=True))
         
         if result > 0:
             print(f"✅ שלחתי market event ל-{result} subscribers")
@@ -129,11 +150,14 @@ def check_metrics():
     try:
         response = requests.get("http://localhost:5001/metrics", timeout=5)
         if response.status_code == 200:
-            metrics = response.json()
+            metrics = {
+                sample.name: sample.value
+                for family in text_string_to_metric_families(response.text)
+                for sample in family.samples
+            }
             print("📈 News Analyzer metrics:")
-            print(f"   Events processed: {metrics.get('processed_events', 0)}")
-            print(f"   Alerts published: {metrics.get('published_alerts', 0)}")
-            print(f"   API calls made: {metrics.get('api_calls_made', 0)}")
+            print(f"   Events processed: {int(metrics.get('news_events_processed_total', 0))}")
+            print(f"   Alerts published: {int(metrics.get('news_alerts_published_total', 0))}")
         else:
             print("❌ לא הצלחתי לקבל metrics")
     except:
@@ -3,16 +3,9 @@
 אבחון ספציפי לNews Analyzer
 """
 
-import sys
-import os
 import threading
 import time
 import json
-from datetime import datetime
-
-# הוספת הpath של המודולים
-sys.path.append(os.path.join(os.path.dirname(__file__), 'shared'))
-sys.path.append(os.path.join(os.path.dirname(__file__), 'services', 'news_analyzer'))
 
 def test_imports():
     """בדיקת יבואים"""
@@ -62,19 +55,25 @@ def test_consumer_creation():
         print(f"   פרטי שגיאה: {str(e)}")
         return None
 
-def test_consumer_manual(consumer):
+def build_test_message(timestamp_ms=None):
+    """הודעת market event לבדיקה - timestamp מחושב פעם אחת ומועבר הלאה"""
+    from shared.models import now_ms
+    
+    return {
+        "symbol": "AAPL",
+        "price": 150.0,
+        "change_percent": 8.0,
+        "volume": 500000,
+        "timestamp_ms": timestamp_ms or now_ms()
+    }
+
+def test_consumer_manual(consumer, timestamp_ms=None):
     """בדיקת עיבוד הודעה ידנית"""
     print("\n🔍 בודק עיבוד הודעה ידנית...")
     
     try:
         # הודעת בדיקה
-        test_message = {
-            "symbol": "AAPL",
-            "price": 150.0,
-            "change_percent": 8.0,
-            "volume": 500000,
-            "timestamp": datetime.now().isoformat()
-        }
+        test_message = build_test_message(timestamp_ms)
         
         print(f"📨 שולח הודעת בדיקה: {test_message}")
         
@@ -124,7 +123,7 @@ def test_consumer_thread():
         print(f"❌ Consumer thread נכשל: {e}")
         return False
 
-def test_full_flow():
+def test_full_flow(timestamp_ms=None):
     """בדיקת זרימה מלאה"""
     print("\n🔍 בודק זרימה מלאה...")
     
@@ -151,13 +150,7 @@ def test_full_flow():
         time.sleep(2)
         
         # שליחת הודעה
-        test_message = {
-            "symbol": "AAPL",
-            "price": 150.0,
-            "change_percent": 8.0,
-            "volume": 500000,
-            "timestamp": datetime.now().isoformat()
-        }
+        test_message = build_test_message(timestamp_ms)
         
         print(f"📨 שולח market event: {test_message}")
         result = publisher.publish('market_events', test_message)
@@ -188,9 +181,13 @@ def main():
         print("❌ יצירת consumer נכשלה - עוצר כאן")
         return
     
-    manual_ok = test_consumer_manual(consumer)
+    # timestamp אחד לכל הודעות הבדיקה
+    from shared.models import now_ms
+    timestamp_ms = now_ms()
+    
+    manual_ok = test_consumer_manual(consumer, timestamp_ms)
     thread_ok = test_consumer_thread()
-    flow_ok = test_full_flow()
+    flow_ok = test_full_flow(timestamp_ms)
     
     print("\n" + "=" * 50)
     print("🎯 תוצאות:")
@@ -208,8 +205,8 @@ def main():
         
     print("\n📝 עזרה:")
     print("1. הפעל Redis: docker-compose up redis")
-    print("2. הפעל Market Scanner: python services/market_scanner/app.py")
-    print("3. הפעל News Analyzer: python services/news_analyzer/app.py")
+    print("2. הפעל Market Scanner: python -m services.market_scanner.app")
+    print("3. הפעל News Analyzer: python -m services.news_analyzer.app")
     print("4. הפעל בדיקה: python debug_news_analyzer.py")
 
 if __name__ == "__main__":
@@ -1,7 +1,8 @@
 from flask import Flask, jsonify
 import logging
+import os
 import threading
-from scheduler import start_scheduler
+from services.market_scanner.scheduler import start_scheduler
 
 app = Flask(__name__)
 logging.basicConfig(level=logging.INFO)
@@ -32,8 +33,12 @@ def initialize_scheduler():
         logger.error(f"Failed to initialize scheduler: {e}")
 
 if __name__ == '__main__':
-    # Initialize scheduler before starting Flask app
-    initialize_scheduler()
+    debug = True
+    
+    # Optimization: The debug reloader runs this module twice (watcher + child);
+    # only start the scheduler in the child that actually serves requests
+    if not debug or os.environ.get("WERKZEUG_RUN_MAIN") == "true":
+        initialize_scheduler()
     
     # Start Flask app
-    app.run(host='0.0.0.0', port=5000, debug=True) 
\ No newline at end of file
+    app.run(host='0.0.0.0', port=5000, debug=debug)
\ No newline at end of file
@@ -0,0 +1,33 @@
+# Gunicorn server hooks for the market scanner.
+# Loaded with -c from the Dockerfile CMD, which also holds the server options.
+import fcntl
+import os
+import tempfile
+
+SCHEDULER_LOCK_PATH = os.path.join(tempfile.gettempdir(), "market_scanner_scheduler.lock")
+
+# Held open for the lifetime of the worker that owns the scheduler
+_scheduler_lock = None
+
+def post_worker_init(worker):
+    """
+    Start the scan scheduler in exactly one worker.
+    
+    Workers only serve the health/status endpoints, so one scheduler avoids a
+    duplicate scan (and Alpha Vantage call) per worker. The first worker to
+    take the lock file runs it; the kernel drops the lock when that worker
+    exits, so the worker gunicorn respawns in its place takes over. Nothing is
+    started in the master, which keeps forks free of application threads.
+    """
+    global _scheduler_lock
+    lock_file = open(SCHEDULER_LOCK_PATH, "w")
+    try:
+        fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        lock_file.close()
+        worker.log.info("Market scan scheduler already runs in another worker")
+        return
+    
+    _scheduler_lock = lock_file
+    from services.market_scanner.app import initialize_scheduler
+    initialize_scheduler()
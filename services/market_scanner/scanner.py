@@ -1,29 +1,59 @@
 import requests
+import hashlib
 import logging
-from datetime import datetime
+import orjson
+import threading
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from typing import Dict, List, Optional
 import time
 
 # Import shared components
-import sys
-import os
-sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
-
 from shared.config import settings
 from shared.pubsub import SimplePubSub
-from shared.models import MarketEvent
+from shared.models import MarketEvent, now_ms
 
 logger = logging.getLogger(__name__)
 
+# Minimum movement before a previously published ticker is published again
+PRICE_EPSILON = 0.01
+CHANGE_PERCENT_EPSILON = 0.05
+
+# Translate table that drops '%' in a single C-level pass
+_STRIP_PCT = str.maketrans('', '', '%')
+
 class StockScanner:
     def __init__(self):
         """Initialize scanner with Redis connection and request session for optimization."""
-        self.pubsub = SimplePubSub(settings.redis_url)
+        # Optimization: market_events consumers are in-house Python - use msgpack
+        self.pubsub = SimplePubSub(settings.redis_url, serializer="msgpack")
         # Optimization: Using requests.Session for connection pooling
         self.session = requests.Session()
+        # requests already advertises 'br' in its default Accept-Encoding
+        # once the brotli decoder is installed
         self.session.headers.update({
             'User-Agent': 'StockAlertSystem/1.0'
         })
+        # Retry throttling/transient server errors a couple of times. Backoff runs
+        # on the scheduler thread, so it is capped (0 s, then 2 s) and ignores
+        # Retry-After; read timeouts are not retried since each already waited
+        # the full request timeout. A scan that still fails is retried by the
+        # next scheduled run.
+        retry = Retry(
+            total=2,
+            read=False,
+            backoff_factor=1,
+            backoff_max=2,
+            respect_retry_after_header=False,
+            status_forcelist=(429, 500, 502, 503, 504),
+            allowed_methods=frozenset(['GET'])
+        )
+        self.session.mount('https://', HTTPAdapter(max_retries=retry))
+        
+        # Optimization: Remember the previous scan to skip unchanged payloads
+        # and only publish tickers that actually moved
+        self._last_hash: Optional[str] = None
+        self._last_events: Dict[str, MarketEvent] = {}
         
     def get_top_gainers(self) -> Optional[Dict]:
         """
@@ -65,12 +95,31 @@ class StockScanner:
             logger.error(f"Unexpected error fetching stock data: {e}")
             return None
 
+    @staticmethod
+    def _payload_hash(top_gainers: List[Dict], min_change_percent: float) -> str:
+        """Stable digest of the top gainers payload used to detect unchanged scans."""
+        payload = orjson.dumps(top_gainers, option=orjson.OPT_SORT_KEYS)
+        digest = hashlib.blake2b(payload, digest_size=8)
+        digest.update(str(min_change_percent).encode())
+        return digest.hexdigest()
+    
+    def _has_changed(self, event: MarketEvent) -> bool:
+        """Check whether a ticker moved enough since it was last published."""
+        previous = self._last_events.get(event.symbol)
+        if previous is None:
+            return True
+        return (
+            abs(event.price - previous.price) > PRICE_EPSILON
+            or abs(event.change_percent - previous.change_percent) > CHANGE_PERCENT_EPSILON
+        )
+
     def process_and_publish_gainers(self, min_change_percent: float = 5.0) -> bool:
         """
         Process top gainers and publish significant movements.
         
-        Optimization: Filter by minimum change percentage to reduce noise
-        and batch process for efficiency.
+        Optimization: Filter by minimum change percentage to reduce noise,
+        skip scans whose payload is identical to the previous one and only
+        publish tickers that changed since they were last published.
         """
         try:
             data = self.get_top_gainers()
@@ -78,41 +127,66 @@ class StockScanner:
                 logger.warning("No top gainers data available")
                 return False
             
-            published_count = 0
-            current_time = datetime.now().isoformat()
+            payload_hash = self._payload_hash(data['top_gainers'], min_change_percent)
+            if payload_hash == self._last_hash:
+                logger.info("Top gainers unchanged since last scan - nothing to publish")
+                return True
+            
+            current_events: Dict[str, MarketEvent] = {}
+            events = []
+            current_time_ms = now_ms()
             
             # Process top gainers with filtering
             for stock in data['top_gainers']:
                 try:
-                    change_percent = float(stock['change_percentage'].replace('%', ''))
+                    change_percent = float(stock['change_percentage'].translate(_STRIP_PCT))
+                    
+                    # Optimization: Filter by minimum change percentage before
+                    # parsing any other field - most rows are rejected here
+                    if change_percent < min_change_percent:
+                        continue
                     
-                    # Filter by minimum change percentage for optimization
-                    if change_percent >= min_change_percent:
-                        # Create market event using Pydantic model for validation
-                        market_event = MarketEvent(
-                            symbol=stock['ticker'],
-                            price=float(stock['price']),
-                            change_percent=change_percent,
-                            volume=int(stock['volume']),
-                            timestamp=current_time
-                        )
-                        
-                        # Publish to Redis
-                        success = self.pubsub.publish(
-                            'market_events', 
-                            market_event.dict()
-                        )
-                        
-                        if success:
-                            published_count += 1
-                            logger.info(f"Published market event for {stock['ticker']}: {change_percent}%")
-                        
+                    # Optimization: Lightweight dataclass, no per-event validation
+                    market_event = MarketEvent(
+                        symbol=stock['ticker'],
+                        price=float(stock['price']),
+                        change_percent=change_percent,
+                        volume=int(stock['volume']),
+                        timestamp_ms=current_time_ms
+                    )
                 except (ValueError, KeyError) as e:
                     logger.error(f"Error processing stock data: {e}")
                     continue
+                
+                if self._has_changed(market_event):
+                    current_events[market_event.symbol] = market_event
+                    events.append(market_event)
+                    logger.debug(f"Queued market event for {market_event.symbol}: {change_percent}%")
+                else:
+                    # Keep comparing against the last *published* event so slow
+                    # drift below the epsilons still adds up to a republish
+                    current_events[market_event.symbol] = self._last_events[market_event.symbol]
+            
+            self._last_hash = payload_hash
+            self._last_events = current_events
+            
+            if not current_events:
+                logger.info("No market events above threshold")
+                return False
             
-            logger.info(f"Published {published_count} market events")
-            return published_count > 0
+            if not events:
+                logger.info("No ticker changed since last scan - nothing to publish")
+                return True
+            
+            # Optimization: Fire-and-forget - the background publisher pipelines
+            # the batch so the scanner thread never waits on server replies
+            queued_count = sum(
+                1 for event in events
+                if self.pubsub.publish_async('market_events', event)
+            )
+            
+            logger.info(f"Queued {queued_count} market events for publishing")
+            return queued_count > 0
             
         except Exception as e:
             logger.error(f"Error in process_and_publish_gainers: {e}")
@@ -125,16 +199,27 @@ class StockScanner:
         Optimization: Includes error handling and logging for monitoring.
         """
         logger.info("Starting market scan...")
-        start_time = time.time()
+        start_ns = time.perf_counter_ns()
         
         try:
             success = self.process_and_publish_gainers()
             
-            execution_time = time.time() - start_time
+            execution_time = (time.perf_counter_ns() - start_ns) / 1e9
             logger.info(f"Market scan completed in {execution_time:.2f} seconds. Success: {success}")
             
         except Exception as e:
             logger.error(f"Market scan failed: {e}")
 
-# Global scanner instance for scheduler
-scanner = StockScanner() 
\ No newline at end of file
+# Global scanner instance for scheduler - created lazily so importing this
+# module does not open Redis/HTTP connections
+_scanner: Optional[StockScanner] = None
+_scanner_lock = threading.Lock()
+
+def get_scanner() -> StockScanner:
+    """Return the shared StockScanner, creating it on first use."""
+    global _scanner
+    if _scanner is None:
+        with _scanner_lock:
+            if _scanner is None:
+                _scanner = StockScanner()
+    return _scanner 
\ No newline at end of file
@@ -1,5 +1,6 @@
-from apscheduler.schedulers.background import BackgroundScheduler
+from apscheduler.schedulers.blocking import BlockingScheduler
 from apscheduler.triggers.interval import IntervalTrigger
+from datetime import datetime
 import logging
 import atexit
 
@@ -9,46 +10,39 @@ def start_scheduler():
     """
     Start the APScheduler for market scanning.
     
-    Optimization: Using BackgroundScheduler to run in separate thread
-    without blocking the main Flask application.
+    Optimization: Using BlockingScheduler inside the thread spawned by the
+    Flask app - it blocks on an internal event until the next job is due,
+    so no extra babysitter thread or periodic wake-ups are needed.
     """
     try:
         # Import scanner here to avoid circular imports
-        from scanner import scanner
+        from services.market_scanner.scanner import get_scanner
+        scanner = get_scanner()
         
         # Create scheduler instance
-        scheduler = BackgroundScheduler()
+        scheduler = BlockingScheduler()
         
         # Add job to run every 5 minutes
+        # Optimization: next_run_time=now makes the scheduler run the initial scan
+        # itself, so it is covered by the same max_instances guard as every tick
         scheduler.add_job(
             func=scanner.scan_market,
             trigger=IntervalTrigger(minutes=5),
             id='market_scan_job',
             name='Market Scanner Job',
             replace_existing=True,
-            max_instances=1  # Optimization: Prevent overlapping scans
+            max_instances=1,  # Optimization: Prevent overlapping scans
+            next_run_time=datetime.now()
         )
         
-        # Start the scheduler
-        scheduler.start()
-        logger.info("Market scanner scheduler started - running every 5 minutes")
-        
-        # Optimization: Run initial scan immediately
-        logger.info("Running initial market scan...")
-        scanner.scan_market()
-        
         # Ensure scheduler shuts down gracefully
-        atexit.register(lambda: scheduler.shutdown())
+        atexit.register(lambda: scheduler.running and scheduler.shutdown(wait=False))
         
-        # Keep the scheduler running
-        try:
-            while True:
-                import time
-                time.sleep(60)  # Check every minute
-        except KeyboardInterrupt:
-            logger.info("Scheduler stopped by user")
-            scheduler.shutdown()
-            
+        # Start the scheduler - blocks this thread until shutdown
+        logger.info("Market scanner scheduler started - initial scan now, then every 5 minutes")
+        scheduler.start()
+        logger.info("Market scanner scheduler stopped")
+    
     except Exception as e:
         logger.error(f"Failed to start scheduler: {e}")
-        raise 
\ No newline at end of file
+        raise
@@ -0,0 +1,4 @@
+"""WSGI entry point for running the market scanner under gunicorn."""
+from services.market_scanner.app import app
+
+application = app
@@ -1,7 +1,10 @@
 from flask import Flask, jsonify
+from prometheus_client import make_wsgi_app
+from werkzeug.middleware.dispatcher import DispatcherMiddleware
 import logging
+import os
 import threading
-from consumer import start_consumer
+from services.news_analyzer.consumer import start_consumer
 
 app = Flask(__name__)
 logging.basicConfig(level=logging.INFO)
@@ -22,20 +25,9 @@ def status():
         "features": ["finnhub_integration", "sentiment_analysis", "redis_pubsub"]
     })
 
-@app.route('/metrics')
-def metrics():
-    """Metrics endpoint for monitoring performance."""
-    try:
-        from consumer import news_consumer
-        return jsonify({
-            "processed_events": getattr(news_consumer, 'processed_count', 0),
-            "published_alerts": getattr(news_consumer, 'published_count', 0),
-            "api_calls_made": getattr(news_consumer, 'api_calls_count', 0),
-            "last_processed": getattr(news_consumer, 'last_processed_time', None)
-        })
-    except Exception as e:
-        logger.error(f"Error getting metrics: {e}")
-        return jsonify({"error": "Metrics unavailable"}), 500
+# Metrics endpoint for monitoring performance - Prometheus text format
+# served straight from the consumer's counters
+app.wsgi_app = DispatcherMiddleware(app.wsgi_app, {'/metrics': make_wsgi_app()})
 
 def initialize_consumer():
     """Initialize the news consumer in a separate thread for optimization."""
@@ -48,8 +40,12 @@ def initialize_consumer():
         logger.error(f"Failed to initialize consumer: {e}")
 
 if __name__ == '__main__':
-    # Initialize consumer before starting Flask app
-    initialize_consumer()
+    debug = True
+    
+    # Optimization: The debug reloader runs this module twice (watcher + child);
+    # only start the consumer in the child that actually serves requests
+    if not debug or os.environ.get("WERKZEUG_RUN_MAIN") == "true":
+        initialize_consumer()
     
     # Start Flask app
-    app.run(host='0.0.0.0', port=5001, debug=True) 
\ No newline at end of file
+    app.run(host='0.0.0.0', port=5001, debug=debug)
\ No newline at end of file
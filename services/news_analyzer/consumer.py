@@ -1,22 +1,49 @@
+import atexit
+import heapq
 import logging
+import threading
 import time
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import Dict, Any
-import json
+from typing import Dict, Any, Callable, List, Optional, Tuple
+from prometheus_client import REGISTRY, Counter, Gauge
 
 # Import shared components
-import sys
-import os
-sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
-
 from shared.config import settings
 from shared.pubsub import SimplePubSub
 from shared.models import NewsAlert
-from news_fetcher import finnhub_fetcher
-from sentiment_analyzer import sentiment_analyzer
+from services.news_analyzer.news_fetcher import finnhub_fetcher
+from services.news_analyzer.sentiment_analyzer import sentiment_analyzer
 
 logger = logging.getLogger(__name__)
 
+# Worker threads processing buffered event batches
+PROCESSING_WORKERS = 8
+
+# Optimization: Prometheus metrics - lock-protected C-level counters, scraped
+# via /metrics without touching the consumer object
+EVENTS_PROCESSED = Counter('news_events_processed_total', 'Market events processed by the news consumer')
+ALERTS_PUBLISHED = Counter('news_alerts_published_total', 'News alerts published to news_alerts')
+LAST_PROCESSED = Gauge('news_last_processed_timestamp_seconds', 'Unix time of the last processed market event')
+
+def _metric_value(name: str) -> float:
+    """Read the current value of a registered metric sample."""
+    return REGISTRY.get_sample_value(name) or 0
+
+def _filter_setting(name: str, doc: str) -> property:
+    """Consumer attribute that rebuilds the bound event filter when assigned."""
+    private_name = '_' + name
+    
+    def fget(self):
+        return getattr(self, private_name)
+    
+    def fset(self, value):
+        setattr(self, private_name, value)
+        self._filter = self._make_filter()
+    
+    return property(fget, fset, doc=doc)
+
 class NewsConsumer:
     """
     Consumer that processes market events and publishes news alerts.
@@ -28,72 +55,125 @@ class NewsConsumer:
     4. Performance monitoring
     """
     
+    # Assigning any of these rebuilds the filter, so the filter and
+    # _mark_processed/_evict_expired always see the same values
+    min_change_percent = _filter_setting('min_change_percent', "Minimum absolute % move to process")
+    min_volume_threshold = _filter_setting('min_volume_threshold', "Minimum volume to process")
+    dedup_window = _filter_setting('dedup_window', "Seconds before a symbol is processed again")
+    
     def __init__(self):
         """Initialize with Redis connections and performance tracking."""
         self.pubsub = SimplePubSub(settings.redis_url)
         
-        # Performance tracking
-        self.processed_count = 0
-        self.published_count = 0
-        self.api_calls_count = 0
-        self.last_processed_time = None
-        
-        # Optimization: Track recently processed symbols to avoid duplicates
-        self.recently_processed = {}
-        self.dedup_window = 1800  # 30 minutes
+        # Optimization: Track recently processed symbols to avoid duplicates.
+        # The expiry heap lets eviction touch only entries that actually expired.
+        # Times are time.monotonic() - cheap and immune to wall-clock jumps.
+        self._recent: "OrderedDict[str, float]" = OrderedDict()
+        self._expiry_heap: List[Tuple[float, str]] = []
+        self._dedup_window = 1800  # 30 minutes
+        self._state_lock = threading.Lock()  # Batches run on several workers
+        # Symbols claimed by a worker whose fetch/publish has not finished yet
+        self._in_flight: set = set()
         
         # Quality filters - Lowered for testing
-        self.min_change_percent = 3.0  # Process smaller moves for testing
-        self.min_volume_threshold = 50000  # Process lower volume stocks
+        self._min_change_percent = 3.0  # Process smaller moves for testing
+        self._min_volume_threshold = 50000  # Process lower volume stocks
+        
+        # Optimization: Buffer incoming events and fetch news for a whole burst
+        # concurrently instead of one blocking request per event
+        self._pending_events: deque = deque()
+        self._pending_signal = threading.Event()
+        self.flush_interval_ms = 200
+        self._flusher_thread = None
+        
+        # Optimization: Batches are processed on a worker pool so a slow Finnhub
+        # round-trip for one burst does not hold up the next one
+        self._executor = ThreadPoolExecutor(
+            max_workers=PROCESSING_WORKERS,
+            thread_name_prefix="news-proc"
+        )
+        
+        self._filter = self._make_filter()
         
         logger.info("News consumer initialized with optimizations")
     
-    def _should_process_event(self, market_event: Dict[str, Any]) -> bool:
+    def _make_filter(self) -> Callable[[str, float, int], bool]:
         """
-        Determine if a market event should be processed.
+        Build the per-event quality filter.
         
-        Optimization: Filter out low-quality events to reduce API calls.
+        Optimization: Thresholds and dedup state are bound as closure locals
+        once, so rejecting an event costs no attribute lookups. Assigning a
+        threshold or dedup_window rebuilds the filter.
+        
+        An accepted event claims its symbol atomically with the dedup check,
+        so a concurrent batch cannot process the same symbol before this one
+        publishes. The caller must hand the claim back via _release_claims.
         """
-        try:
-            symbol = market_event.get('symbol', '')
-            change_percent = market_event.get('change_percent', 0)
-            volume = market_event.get('volume', 0)
-            
+        min_change_percent = self.min_change_percent
+        min_volume_threshold = self.min_volume_threshold
+        dedup_window = self.dedup_window
+        recent_get = self._recent.get
+        in_flight = self._in_flight
+        state_lock = self._state_lock
+        monotonic = time.monotonic
+        
+        def should_process(symbol: str, change_percent: float, volume: int) -> bool:
             # Filter by change percentage
-            if abs(change_percent) < self.min_change_percent:
-                logger.debug(f"Skipping {symbol}: change {change_percent}% below threshold")
+            if -min_change_percent < change_percent < min_change_percent:
+                logger.debug("Skipping %s: change %s%% below threshold", symbol, change_percent)
                 return False
             
             # Filter by volume
-            if volume < self.min_volume_threshold:
-                logger.debug(f"Skipping {symbol}: volume {volume} below threshold")
+            if volume < min_volume_threshold:
+                logger.debug("Skipping %s: volume %s below threshold", symbol, volume)
                 return False
             
-            # Check if recently processed (deduplication)
-            current_time = time.time()
-            if symbol in self.recently_processed:
-                last_processed = self.recently_processed[symbol]
-                if current_time - last_processed < self.dedup_window:
-                    logger.debug(f"Skipping {symbol}: recently processed")
+            # Check if recently processed or being processed (deduplication)
+            with state_lock:
+                if symbol in in_flight:
+                    logger.debug("Skipping %s: already being processed", symbol)
                     return False
+                last_processed = recent_get(symbol)
+                if last_processed is not None and monotonic() - last_processed < dedup_window:
+                    logger.debug("Skipping %s: recently processed", symbol)
+                    return False
+                in_flight.add(symbol)
             
             return True
+        
+        return should_process
+    
+    def _should_process_event(self, market_event: Dict[str, Any]) -> bool:
+        """
+        Determine if a market event should be processed.
+        
+        Optimization: Filter out low-quality events to reduce API calls.
+        """
+        try:
+            return self._filter(
+                market_event.get('symbol', ''),
+                market_event.get('change_percent', 0),
+                market_event.get('volume', 0)
+            )
             
         except Exception as e:
             logger.error(f"Error checking event processing criteria: {e}")
             return False
     
+    def _release_claims(self, symbols) -> None:
+        """Release symbols claimed by _should_process_event once their processing ended."""
+        with self._state_lock:
+            self._in_flight.difference_update(symbols)
+    
     def _process_market_event(self, market_event: Dict[str, Any]) -> None:
         """
-        Process a single market event.
+        Process a single market event synchronously.
         
-        Optimization: Comprehensive error handling and performance tracking.
+        Kept for callers that handle one event at a time; the subscriber path
+        goes through the buffered _process_batch instead.
         """
-        start_time = time.time()
-        
         try:
             symbol = market_event.get('symbol', '')
-            price = market_event.get('price', 0)
             change_percent = market_event.get('change_percent', 0)
             
             logger.info(f"Processing market event: {symbol} ({change_percent:+.1f}%)")
@@ -102,9 +182,66 @@ class NewsConsumer:
             if not self._should_process_event(market_event):
                 return
             
-            # Fetch news from Finnhub
-            logger.info(f"Fetching news for {symbol}")
-            news_articles = finnhub_fetcher.get_company_news(symbol, days_back=1)
+            try:
+                # Fetch news from Finnhub
+                logger.info(f"Fetching news for {symbol}")
+                news_articles = finnhub_fetcher.get_company_news(symbol, days_back=1)
+                self._analyze_and_publish(market_event, news_articles)
+            finally:
+                self._release_claims((symbol,))
+            
+        except Exception as e:
+            logger.error(f"Error processing market event: {e}")
+    
+    def _process_batch(self, market_events: List[Dict[str, Any]]) -> None:
+        """
+        Process a burst of buffered market events.
+        
+        Optimization: Filter first, then fetch news for every remaining symbol
+        concurrently. The fetcher's rate limiter still starts uncached calls
+        min_call_interval (1 s) apart, so K symbols take about (K-1) s plus one
+        Finnhub round-trip rather than K sequential round-trips.
+        """
+        candidates: Dict[str, Dict[str, Any]] = {}
+        try:
+            # Latest event per symbol wins within a burst
+            latest: Dict[str, Dict[str, Any]] = {}
+            for market_event in market_events:
+                symbol = market_event.get('symbol', '')
+                logger.info(f"Processing market event: {symbol} ({market_event.get('change_percent', 0):+.1f}%)")
+                latest[symbol] = market_event
+            
+            for symbol, market_event in latest.items():
+                if self._should_process_event(market_event):
+                    candidates[symbol] = market_event
+            
+            if not candidates:
+                return
+            
+            logger.info(f"Fetching news for {len(candidates)} symbols: {', '.join(candidates)}")
+            news_by_symbol = finnhub_fetcher.get_company_news_many(list(candidates), days_back=1)
+            
+            for symbol, market_event in candidates.items():
+                self._analyze_and_publish(market_event, news_by_symbol.get(symbol, []))
+                
+        except Exception as e:
+            logger.error(f"Error processing market event batch: {e}")
+        finally:
+            # Published symbols are in _recent by now; failed ones may be retried
+            self._release_claims(candidates)
+    
+    def _analyze_and_publish(self, market_event: Dict[str, Any], news_articles) -> None:
+        """
+        Analyze fetched news for one market event and publish the news alert.
+        
+        Optimization: Comprehensive error handling and performance tracking.
+        """
+        start_ns = time.perf_counter_ns()
+        
+        try:
+            symbol = market_event.get('symbol', '')
+            price = market_event.get('price', 0)
+            change_percent = market_event.get('change_percent', 0)
             
             if not news_articles:
                 logger.warning(f"No news found for {symbol}")
@@ -122,33 +259,53 @@ class NewsConsumer:
                 news_sentiment=sentiment_result['sentiment_score'],
                 news_count=sentiment_result['article_count'],
                 news_summary=self._create_news_summary(news_articles, sentiment_result),
-                top_headlines=[article.headline for article in news_articles[:3]],
-                timestamp=datetime.now()
+                top_headlines=[article.headline for article in news_articles[:3]]
             )
             
             # Publish news alert
-            success = self.pubsub.publish('news_alerts', news_alert.dict())
+            # Optimization: Queued for the background publisher, which flushes
+            # alerts from a burst through one pipelined round-trip. The model is
+            # dumped straight to JSON by pydantic-core, skipping the intermediate dict
+            success = self.pubsub.publish_async('news_alerts', news_alert)
             
             if success:
-                self.published_count += 1
-                logger.info(f"Published news alert for {symbol}: sentiment={sentiment_result['sentiment_score']:.3f}")
+                ALERTS_PUBLISHED.inc()
+                logger.info(f"Queued news alert for {symbol}: sentiment={sentiment_result['sentiment_score']:.3f}")
                 
-                # Mark as recently processed
-                self.recently_processed[symbol] = time.time()
-                
-                # Clean up old entries (optimization)
-                self._cleanup_recent_cache()
+                # Mark as recently processed and evict expired entries (optimization)
+                self._mark_processed(symbol)
+                self._evict_expired()
             
             # Update performance metrics
-            self.processed_count += 1
-            self.last_processed_time = datetime.now().isoformat()
+            EVENTS_PROCESSED.inc()
+            LAST_PROCESSED.set_to_current_time()
             
-            processing_time = time.time() - start_time
+            processing_time = (time.perf_counter_ns() - start_ns) / 1e9
             logger.info(f"Processed {symbol} in {processing_time:.2f}s")
             
         except Exception as e:
             logger.error(f"Error processing market event: {e}")
     
+    def _enqueue_market_event(self, market_event: Dict[str, Any]) -> None:
+        """Subscriber callback: buffer the event and wake the flusher."""
+        self._pending_events.append(market_event)
+        self._pending_signal.set()
+    
+    def _flush_loop(self) -> None:
+        """Drain buffered events every flush_interval_ms while events keep arriving."""
+        while True:
+            self._pending_signal.wait()
+            # Give the rest of the burst a moment to arrive before fetching
+            time.sleep(self.flush_interval_ms / 1000)
+            self._pending_signal.clear()
+            
+            batch = []
+            while self._pending_events:
+                batch.append(self._pending_events.popleft())
+            
+            if batch:
+                self._executor.submit(self._process_batch, batch)
+    
     def _create_news_summary(self, news_articles, sentiment_result) -> str:
         """
         Create a concise news summary.
@@ -180,24 +337,36 @@ class NewsConsumer:
             logger.error(f"Error creating news summary: {e}")
             return "News summary unavailable"
     
-    def _cleanup_recent_cache(self) -> None:
+    def _mark_processed(self, symbol: str) -> None:
+        """Record that an alert was published for a symbol."""
+        now = time.monotonic()
+        with self._state_lock:
+            self._recent[symbol] = now
+            self._recent.move_to_end(symbol)
+            heapq.heappush(self._expiry_heap, (now + self.dedup_window, symbol))
+    
+    def _evict_expired(self) -> None:
         """
-        Clean up old entries from recently processed cache.
+        Evict expired entries from the recently processed cache.
         
-        Optimization: Prevent memory growth over time.
+        Optimization: Pops only expired heap entries - O(k log n) for k expired
+        symbols instead of scanning the whole cache. Heap entries left behind by
+        a re-processed symbol are skipped lazily because its newer timestamp
+        has not expired yet.
         """
         try:
-            current_time = time.time()
-            expired_symbols = [
-                symbol for symbol, timestamp in self.recently_processed.items()
-                if current_time - timestamp > self.dedup_window
-            ]
-            
-            for symbol in expired_symbols:
-                del self.recently_processed[symbol]
-                
-            if expired_symbols:
-                logger.debug(f"Cleaned up {len(expired_symbols)} expired cache entries")
+            now = time.monotonic()
+            evicted = 0
+            with self._state_lock:
+                while self._expiry_heap and self._expiry_heap[0][0] <= now:
+                    _, symbol = heapq.heappop(self._expiry_heap)
+                    last_processed = self._recent.get(symbol)
+                    if last_processed is not None and now - last_processed >= self.dedup_window:
+                        del self._recent[symbol]
+                        evicted += 1
+            
+            if evicted:
+                logger.debug(f"Cleaned up {evicted} expired cache entries")
                 
         except Exception as e:
             logger.error(f"Error cleaning up cache: {e}")
@@ -211,26 +380,45 @@ class NewsConsumer:
         logger.info("Starting to listen for market events...")
         
         try:
+            if self._flusher_thread is None:
+                self._flusher_thread = threading.Thread(
+                    target=self._flush_loop,
+                    name="news-flusher",
+                    daemon=True
+                )
+                self._flusher_thread.start()
+                atexit.register(self.stop)
+            
             # Subscribe to market_events channel
-            self.pubsub.subscribe('market_events', self._process_market_event)
+            self.pubsub.subscribe('market_events', self._enqueue_market_event)
             
         except Exception as e:
             logger.error(f"Error in news consumer: {e}")
             # In a production system, we might want to retry here
             raise
     
+    def stop(self) -> None:
+        """Wait for in-flight batches to finish and release the worker pool."""
+        self._executor.shutdown(wait=True)
+        self.pubsub.flush()
+    
     def get_performance_stats(self) -> Dict[str, Any]:
         """Get performance statistics for monitoring."""
         # Get stats from dependencies
         fetcher_stats = finnhub_fetcher.get_performance_stats()
         sentiment_stats = sentiment_analyzer.get_performance_stats()
         
+        last_processed_ts = _metric_value('news_last_processed_timestamp_seconds')
+        last_processed: Optional[str] = (
+            datetime.fromtimestamp(last_processed_ts).isoformat() if last_processed_ts else None
+        )
+        
         return {
             "consumer_stats": {
-                "processed_events": self.processed_count,
-                "published_alerts": self.published_count,
-                "last_processed": self.last_processed_time,
-                "recently_processed_count": len(self.recently_processed)
+                "processed_events": int(_metric_value('news_events_processed_total')),
+                "published_alerts": int(_metric_value('news_alerts_published_total')),
+                "last_processed": last_processed,
+                "recently_processed_count": len(self._recent)
             },
             "fetcher_stats": fetcher_stats,
             "sentiment_stats": sentiment_stats
@@ -0,0 +1,8 @@
+# Gunicorn server hooks for the news analyzer.
+# Loaded with -c from the Dockerfile CMD, which also holds the server options.
+# Keep a single worker: /metrics reads counters from the in-process consumer.
+
+def post_worker_init(worker):
+    """Start the market events consumer inside the worker that serves /metrics."""
+    from services.news_analyzer.app import initialize_consumer
+    initialize_consumer()
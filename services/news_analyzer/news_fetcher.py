@@ -1,20 +1,30 @@
 import requests
+import atexit
 import logging
+import orjson
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import List, Dict, Optional
-import json
+from cachetools import TTLCache
+from requests.adapters import HTTPAdapter
+from typing import List, Dict, Optional, Tuple
 
 # Import shared components
-import sys
-import os
-sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
-
 from shared.config import settings
 from shared.models import NewsData
 
 logger = logging.getLogger(__name__)
 
+# Upper bound on in-flight Finnhub requests across all callers; also the size
+# of the session's connection pool
+MAX_CONCURRENT_REQUESTS = 10
+
+# Finnhub endpoints, built once at import time
+FINNHUB_API_URL = "https://finnhub.io/api/v1"
+COMPANY_NEWS_URL = f"{FINNHUB_API_URL}/company-news"
+MARKET_NEWS_URL = f"{FINNHUB_API_URL}/news"
+
 class FinnhubNewsFetcher:
     """
     Finnhub API client optimized for performance and reliability.
@@ -34,38 +44,135 @@ class FinnhubNewsFetcher:
             'X-Finnhub-Token': settings.finnhub_api_key,
             'User-Agent': 'StockAlertSystem/1.0'
         })
+        # Optimization: Keep-alive pool sized to the request concurrency so every
+        # concurrent request reuses a warm TLS connection instead of opening one.
+        # Several consumer batches can fetch at once, so _request_slots caps the
+        # in-flight requests of all of them at the pool size.
+        self.session.mount('https://', HTTPAdapter(
+            pool_connections=1,
+            pool_maxsize=MAX_CONCURRENT_REQUESTS
+        ))
+        self._request_slots = threading.BoundedSemaphore(MAX_CONCURRENT_REQUESTS)
+        atexit.register(self.session.close)
         
         # Simple caching for optimization (avoid duplicate API calls)
-        self.news_cache = {}
+        # Optimization: Size-bounded cache with true per-entry TTL expiry
         self.cache_ttl = 300  # 5 minutes cache TTL
+        self.news_cache = TTLCache(maxsize=1024, ttl=self.cache_ttl)
+        self._cache_lock = threading.Lock()  # TTLCache is not thread-safe
+        
+        # Optimization: ETag/Last-Modified of the last response per key, kept
+        # past the TTL so expired entries are revalidated with a conditional
+        # GET - a 304 carries no body to download or parse
+        self._validators = TTLCache(maxsize=1024, ttl=3600)
         
         # Rate limiting - Finnhub allows 60 calls/minute
         self.last_call_time = 0
         self.min_call_interval = 1.0  # 1 second between calls
+        self._rate_lock = threading.Lock()
         
-        # Performance metrics
+        # Performance metrics (updated under _cache_lock)
         self.api_calls_count = 0
         self.cache_hits = 0
+        self.not_modified_count = 0
         
     def _rate_limit(self):
-        """Implement rate limiting to avoid API quota issues."""
-        current_time = time.time()
-        time_since_last_call = current_time - self.last_call_time
+        """
+        Implement rate limiting to avoid API quota issues.
         
-        if time_since_last_call < self.min_call_interval:
-            sleep_time = self.min_call_interval - time_since_last_call
+        Thread-safe: each caller reserves the next free call slot under the lock
+        and sleeps outside it, so concurrent fetches stay spaced out without
+        serializing their network round-trips.
+        """
+        with self._rate_lock:
+            current_time = time.time()
+            next_slot = self.last_call_time + self.min_call_interval
+            sleep_time = next_slot - current_time
+            self.last_call_time = max(current_time, next_slot)
+        
+        if sleep_time > 0:
             logger.debug(f"Rate limiting: sleeping for {sleep_time:.2f} seconds")
             time.sleep(sleep_time)
-        
-        self.last_call_time = time.time()
     
-    def _get_cache_key(self, symbol: str, category: str) -> str:
-        """Generate cache key for optimization."""
-        return f"{symbol}:{category}:{int(time.time() / self.cache_ttl)}"
+    def _get_cached(self, cache_key: Tuple) -> Optional[List[NewsData]]:
+        """Return cached news for a key, counting the hit, or None on a miss."""
+        with self._cache_lock:
+            news_list = self.news_cache.get(cache_key)
+            if news_list is not None:
+                self.cache_hits += 1
+            return news_list
     
-    def _is_cache_valid(self, cache_key: str) -> bool:
-        """Check if cached data is still valid."""
-        return cache_key in self.news_cache
+    def _set_cached(self, cache_key: Tuple, news_list: List[NewsData]) -> None:
+        """Store fetched news in the cache."""
+        with self._cache_lock:
+            self.news_cache[cache_key] = news_list
+    
+    def _fetch_news(self, cache_key: Tuple, url: str, params: Dict, limit: int) -> List[NewsData]:
+        """
+        GET a Finnhub news endpoint and convert the first `limit` articles.
+        
+        Optimization: Sends If-None-Match / If-Modified-Since when an earlier
+        response for this key carried validators; on 304 Not Modified the
+        previously converted articles are reused.
+        """
+        with self._cache_lock:
+            validator = self._validators.get(cache_key)
+        
+        headers = {}
+        if validator is not None:
+            etag, last_modified, _ = validator
+            if etag:
+                headers['If-None-Match'] = etag
+            if last_modified:
+                headers['If-Modified-Since'] = last_modified
+        
+        with self._request_slots:
+            response = self.session.get(url, params=params, headers=headers, timeout=10)
+        response.raise_for_status()
+        
+        not_modified = response.status_code == 304 and validator is not None
+        with self._cache_lock:
+            self.api_calls_count += 1
+            if not_modified:
+                self.not_modified_count += 1
+        
+        if not_modified:
+            return validator[2]
+        
+        # Process response
+        # Optimization: orjson parses the raw body straight from bytes (no
+        # text decode) and articles past the limit are sliced off before
+        # any NewsData is built
+        news_list = self._to_news_data(orjson.loads(response.content)[:limit])
+        
+        etag = response.headers.get('ETag')
+        last_modified = response.headers.get('Last-Modified')
+        if etag or last_modified:
+            with self._cache_lock:
+                self._validators[cache_key] = (etag, last_modified, news_list)
+        
+        return news_list
+    
+    @staticmethod
+    def _to_news_data(articles: List[Dict]) -> List[NewsData]:
+        """
+        Convert raw Finnhub articles to NewsData.
+        
+        Optimization: Bulk construction in a single comprehension.
+        Finnhub sometimes sends null fields, so they are coerced to empty
+        values here rather than failing NewsAlert validation downstream.
+        """
+        return [
+            NewsData(
+                headline=article.get('headline') or '',
+                summary=article.get('summary') or '',
+                url=article.get('url') or '',
+                datetime=article.get('datetime') or 0,
+                source=article.get('source') or ''
+            )
+            for article in articles
+            if isinstance(article, dict)
+        ]
     
     def get_company_news(self, symbol: str, days_back: int = 1) -> List[NewsData]:
         """
@@ -74,11 +181,11 @@ class FinnhubNewsFetcher:
         Optimization: Uses caching and rate limiting for better performance.
         """
         # Check cache first
-        cache_key = self._get_cache_key(symbol, "company_news")
-        if self._is_cache_valid(cache_key):
+        cache_key = (symbol, "company_news")
+        cached = self._get_cached(cache_key)
+        if cached is not None:
             logger.debug(f"Cache hit for {symbol} company news")
-            self.cache_hits += 1
-            return self.news_cache[cache_key]
+            return cached
         
         try:
             # Calculate date range
@@ -93,39 +200,17 @@ class FinnhubNewsFetcher:
             self._rate_limit()
             
             # Make API call
-            url = "https://finnhub.io/api/v1/company-news"
             params = {
                 'symbol': symbol,
                 'from': from_str,
                 'to': to_str
             }
             
-            response = self.session.get(url, params=params, timeout=10)
-            response.raise_for_status()
-            
-            self.api_calls_count += 1
-            
-            # Process response
-            news_data = response.json()
-            
-            # Convert to NewsData models
-            news_list = []
-            for article in news_data[:10]:  # Limit to top 10 for performance
-                try:
-                    news_item = NewsData(
-                        headline=article.get('headline', ''),
-                        summary=article.get('summary', ''),
-                        url=article.get('url', ''),
-                        datetime=article.get('datetime', 0),
-                        source=article.get('source', '')
-                    )
-                    news_list.append(news_item)
-                except Exception as e:
-                    logger.warning(f"Error processing news item: {e}")
-                    continue
+            # Convert to NewsData (limit to top 10 for performance)
+            news_list = self._fetch_news(cache_key, COMPANY_NEWS_URL, params, limit=10)
             
             # Cache the results
-            self.news_cache[cache_key] = news_list
+            self._set_cached(cache_key, news_list)
             
             logger.info(f"Fetched {len(news_list)} news articles for {symbol}")
             return news_list
@@ -137,55 +222,56 @@ class FinnhubNewsFetcher:
             logger.error(f"Unexpected error fetching news for {symbol}: {e}")
             return []
     
+    def get_company_news_many(self, symbols: List[str], days_back: int = 1) -> Dict[str, List[NewsData]]:
+        """
+        Fetch company news for several symbols concurrently.
+        
+        Optimization: Requests for all symbols are in flight at the same time over
+        the shared session, so N symbols cost roughly one round-trip of wall-clock
+        time instead of N (still subject to rate limiting).
+        """
+        unique_symbols = list(dict.fromkeys(symbols))
+        if not unique_symbols:
+            return {}
+        
+        max_workers = min(MAX_CONCURRENT_REQUESTS, len(unique_symbols))
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="finnhub") as executor:
+            results = executor.map(
+                lambda symbol: self.get_company_news(symbol, days_back=days_back),
+                unique_symbols
+            )
+            return dict(zip(unique_symbols, results))
+    
     def get_market_news(self, category: str = "general", limit: int = 20) -> List[NewsData]:
         """
         Fetch general market news from Finnhub.
         
         Optimization: Cached results to reduce API calls.
         """
-        cache_key = self._get_cache_key("market", category)
-        if self._is_cache_valid(cache_key):
+        # limit is part of the key: _fetch_news keeps only the first `limit`
+        # articles, so a list cached (or revalidated) for a smaller limit
+        # must not be returned for a larger one
+        cache_key = ("market", category, limit)
+        cached = self._get_cached(cache_key)
+        if cached is not None:
             logger.debug(f"Cache hit for market news: {category}")
-            self.cache_hits += 1
-            return self.news_cache[cache_key]
+            return cached
         
         try:
             # Rate limiting
             self._rate_limit()
             
             # Make API call
-            url = "https://finnhub.io/api/v1/news"
             params = {
                 'category': category,
                 'minId': 0
             }
             
-            response = self.session.get(url, params=params, timeout=10)
-            response.raise_for_status()
-            
-            self.api_calls_count += 1
-            
-            # Process response
-            news_data = response.json()
-            
-            # Convert to NewsData models
-            news_list = []
-            for article in news_data[:limit]:
-                try:
-                    news_item = NewsData(
-                        headline=article.get('headline', ''),
-                        summary=article.get('summary', ''),
-                        url=article.get('url', ''),
-                        datetime=article.get('datetime', 0),
-                        source=article.get('source', '')
-                    )
-                    news_list.append(news_item)
-                except Exception as e:
-                    logger.warning(f"Error processing market news item: {e}")
-                    continue
+            # Convert to NewsData
+            news_list = self._fetch_news(cache_key, MARKET_NEWS_URL, params, limit=limit)
             
             # Cache the results
-            self.news_cache[cache_key] = news_list
+            self._set_cached(cache_key, news_list)
             
             logger.info(f"Fetched {len(news_list)} market news articles")
             return news_list
@@ -203,6 +289,7 @@ class FinnhubNewsFetcher:
             "api_calls_made": self.api_calls_count,
             "cache_hits": self.cache_hits,
             "cache_hit_ratio": self.cache_hits / max(self.api_calls_count, 1),
+            "not_modified_responses": self.not_modified_count,
             "cached_items": len(self.news_cache)
         }
 
@@ -0,0 +1,4 @@
+"""WSGI entry point for running the news analyzer under gunicorn."""
+from services.news_analyzer.app import app
+
+application = app
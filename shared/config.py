@@ -1,5 +1,5 @@
 # shared/config.py
-from pydantic_settings import BaseSettings
+from pydantic_settings import BaseSettings, SettingsConfigDict
 from pydantic import Field
 import os
 from typing import Optional
@@ -14,33 +14,32 @@ class Settings(BaseSettings):
     # Alpha Vantage API - using demo key as fallback for testing
     alpha_vantage_api_key: str = Field(
         default="demo", 
-        env="ALPHA_VANTAGE_API_KEY",
         description="Alpha Vantage API key (demo key works for testing)"
     )
     
     # News APIs - optional for basic functionality
     news_api_key: Optional[str] = Field(
         default=None, 
-        env="NEWS_API_KEY",
         description="News API key (optional)"
     )
     
     finnhub_api_key: Optional[str] = Field(
         default=None, 
-        env="FINNHUB_API_KEY",
         description="Finnhub API key (optional)"
     )
     
     # Email configuration - optional for notifications
     smtp_server: str = "smtp.gmail.com"
     smtp_port: int = 587
-    smtp_username: Optional[str] = Field(default=None, env="SMTP_USERNAME")
-    smtp_password: Optional[str] = Field(default=None, env="SMTP_PASSWORD")
+    smtp_username: Optional[str] = None
+    smtp_password: Optional[str] = None
 
-    class Config:
-        # Try multiple .env file locations
-        env_file_encoding = 'utf-8'
-        case_sensitive = False
+    # Environment variables map to field names case-insensitively
+    # (FINNHUB_API_KEY -> finnhub_api_key); the .env file is located in __init__
+    model_config = SettingsConfigDict(
+        env_file_encoding='utf-8',
+        case_sensitive=False
+    )
         
     def __init__(self, **kwargs):
         # Try to find .env file in multiple locations
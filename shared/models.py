@@ -1,6 +1,11 @@
 from pydantic import BaseModel, Field
-from datetime import datetime
+from dataclasses import dataclass, field
 from typing import Optional, List
+import time
+
+def now_ms() -> int:
+    """Current Unix time in epoch milliseconds."""
+    return time.time_ns() // 1_000_000
 
 class StockAlert(BaseModel):
     """Model for stock market events with validation."""
@@ -8,33 +13,57 @@ class StockAlert(BaseModel):
     price: float = Field(..., gt=0, description="Current stock price")
     change_percent: float = Field(..., description="Percentage change")
     volume: int = Field(..., ge=0, description="Trading volume")
-    timestamp: datetime = Field(default_factory=datetime.now, description="Event timestamp")
-
-class NewsAlert(BaseModel):
-    """Model for news-based alerts with sentiment analysis."""
-    symbol: str = Field(..., min_length=1, max_length=10, description="Stock ticker symbol")
-    price: float = Field(..., gt=0, description="Current stock price")
-    change_percent: float = Field(..., description="Percentage change")
-    news_sentiment: float = Field(..., ge=0, le=1, description="Sentiment score (0-1)")
-    news_summary: str = Field(..., max_length=500, description="Brief news summary")
-    timestamp: datetime = Field(default_factory=datetime.now, description="Alert timestamp")
+    timestamp_ms: int = Field(default_factory=now_ms, description="Event time (epoch milliseconds)")
 
-class MarketEvent(BaseModel):
-    """Model for market scanner events - optimized for fast serialization."""
+@dataclass(slots=True, frozen=True)
+class MarketEvent:
+    """
+    Market scanner event - optimized for fast serialization.
+    
+    Plain slotted dataclass instead of a Pydantic model: events are built from
+    already-parsed scanner data on the publish hot path, so validation is skipped.
+    Frozen because published events are shared with the scanner's change
+    tracking and must not be modified afterwards.
+    """
     symbol: str
     price: float
     change_percent: float
     volume: int
-    timestamp: str  # Using string for faster JSON serialization
+    # Epoch milliseconds: an int encodes far faster than an ISO string; readers
+    # that need a date render it on demand
+    timestamp_ms: int = field(default_factory=now_ms)
+
+class MarketEventIn(BaseModel):
+    """
+    Validating model for market events arriving from untrusted input.
+    
+    Use at ingress only; convert with to_event() so the publish path keeps the
+    lightweight MarketEvent dataclass.
+    """
+    symbol: str = Field(..., min_length=1, max_length=10, description="Stock ticker symbol")
+    price: float = Field(..., gt=0, description="Current stock price")
+    change_percent: float = Field(..., description="Percentage change")
+    volume: int = Field(..., ge=0, description="Trading volume")
+    timestamp_ms: int = Field(default_factory=now_ms, description="Event time (epoch milliseconds)")
     
-    class Config:
-        # Optimization: Enable JSON encoders for better performance
-        json_encoders = {
-            datetime: lambda v: v.isoformat()
-        }
+    def to_event(self) -> MarketEvent:
+        """Convert to the dataclass used on the publish path."""
+        return MarketEvent(
+            symbol=self.symbol,
+            price=self.price,
+            change_percent=self.change_percent,
+            volume=self.volume,
+            timestamp_ms=self.timestamp_ms
+        )
 
-class NewsData(BaseModel):
-    """Model for news data from Finnhub API."""
+@dataclass(slots=True, frozen=True)
+class NewsData:
+    """
+    News data from Finnhub API.
+    
+    Slotted dataclass instead of a Pydantic model: articles are built in bulk
+    from API responses, so per-instance validation overhead is avoided.
+    """
     headline: str
     summary: str
     url: str
@@ -50,10 +79,4 @@ class NewsAlert(BaseModel):
     news_count: int = Field(..., ge=0, description="Number of news articles analyzed")
     news_summary: str = Field(..., max_length=500, description="Brief news summary")
     top_headlines: List[str] = Field(default_factory=list, description="Top headlines")
-    timestamp: datetime = Field(default_factory=datetime.now, description="Alert timestamp")
-    
-    class Config:
-        # Optimization: Enable JSON encoders for better performance
-        json_encoders = {
-            datetime: lambda v: v.isoformat()
-        } 
\ No newline at end of file
+    timestamp_ms: int = Field(default_factory=now_ms, description="Alert time (epoch milliseconds)") 
\ No newline at end of file
@@ -1,62 +1,432 @@
 import redis
-import json
+import redis.asyncio as aioredis
+import dataclasses
+import inspect
+import msgpack
 import logging
-from typing import Callable, Dict, Any
+import queue
+import socket
+import threading
+import time
+from functools import partial
+from typing import Awaitable, Callable, Dict, Any, Iterable, Optional, Tuple
+from pydantic import BaseModel
+
+try:
+    import orjson
+except ImportError:  # orjson is in requirements.txt; stdlib json keeps the wire format working without it
+    orjson = None
+    import json
 
 logger = logging.getLogger(__name__)
 
+# Messages can be plain dicts, flat dataclasses (e.g. shared.models.MarketEvent),
+# pydantic models (e.g. shared.models.NewsAlert) or bytes that are already
+# encoded and are sent as-is
+Message = Any
+
+# Supported wire formats; subscribers detect the format of each message
+SERIALIZERS = ("json", "msgpack")
+
+# One-byte format tags so producers using different serializers can share a
+# channel. msgpack payloads are always tagged; JSON is published untagged so
+# any client can read it, but a b'J' tag is accepted too.
+MSGPACK_TAG = b"M"
+JSON_TAG = b"J"
+
+# Shared connection pools, one per Redis URL
+_POOLS: Dict[str, redis.ConnectionPool] = {}
+_POOLS_LOCK = threading.Lock()
+
+# Probe idle connections so they survive NAT/load-balancer idle timeouts.
+# A quiet subscriber is already kept alive by health_check_interval, so the
+# first probe can wait a minute; three missed probes drop a dead peer.
+_KEEPALIVE_OPTIONS = {
+    option: value
+    for option, value in (
+        (getattr(socket, "TCP_KEEPIDLE", None), 60),
+        (getattr(socket, "TCP_KEEPINTVL", None), 10),
+        (getattr(socket, "TCP_KEEPCNT", None), 3),
+    )
+    if option is not None
+}
+
+# Socket settings shared by the sync pool and asyncio clients. redis-py sets
+# TCP_NODELAY on every connection it opens, so single PUBLISHes never wait on
+# Nagle coalescing; batching is done explicitly by the pipelined publisher.
+_CONNECTION_OPTIONS: Dict[str, Any] = {
+    "decode_responses": False,  # Raw bytes: payloads may be msgpack
+    "socket_keepalive": True,
+    "socket_keepalive_options": _KEEPALIVE_OPTIONS,
+    "health_check_interval": 30,
+}
+
+def get_connection_pool(redis_url: str) -> redis.ConnectionPool:
+    """
+    Return the process-wide connection pool for a Redis URL.
+    
+    Optimization: Every SimplePubSub instance and ad-hoc client in the process
+    shares one pool, so the TCP handshake is paid once per connection instead
+    of once per client.
+    """
+    pool = _POOLS.get(redis_url)
+    if pool is None:
+        with _POOLS_LOCK:
+            pool = _POOLS.get(redis_url)
+            if pool is None:
+                pool = redis.ConnectionPool.from_url(
+                    redis_url,
+                    max_connections=32,
+                    **_CONNECTION_OPTIONS
+                )
+                _POOLS[redis_url] = pool
+    return pool
+
+def _encode_default(obj: Any) -> Any:
+    """Convert values msgpack/stdlib json cannot encode natively (models, dataclasses, datetimes)."""
+    if isinstance(obj, BaseModel):
+        return obj.model_dump()
+    if dataclasses.is_dataclass(obj):
+        return dataclasses.asdict(obj)
+    if hasattr(obj, "isoformat"):
+        return obj.isoformat()
+    raise TypeError(f"Cannot serialize object of type {type(obj).__name__}")
+
+if orjson is not None:
+    # Optimization: Rust-backed encoder/decoder working directly on bytes;
+    # dataclasses and datetimes are serialized natively
+    _json_dumps = orjson.dumps
+    _json_loads = orjson.loads
+else:
+    def _json_dumps(data: Any) -> bytes:
+        return json.dumps(data, separators=(",", ":"), default=_encode_default).encode()
+    
+    _json_loads = json.loads
+
+_msgpack_packb = partial(msgpack.packb, use_bin_type=True, default=_encode_default)
+
+def _msgpack_dumps(data: Any) -> bytes:
+    """Encode a message as tagged msgpack."""
+    return MSGPACK_TAG + _msgpack_packb(data)
+
+def _is_msgpack(payload: bytes) -> bool:
+    """Untagged msgpack maps/arrays start with 0x80-0x9f or 0xdc-0xdf; JSON text never does."""
+    first = payload[0] if payload else 0
+    return 0x80 <= first <= 0x9f or 0xdc <= first <= 0xdf
+
+def decode_message(payload: bytes) -> Dict[str, Any]:
+    """
+    Decode a pub/sub payload published as either JSON or msgpack.
+    
+    Tagged payloads are dispatched on their first byte; untagged msgpack from
+    older producers is still recognised by its leading type byte.
+    """
+    tag = payload[:1]
+    if tag == MSGPACK_TAG:
+        # memoryview skips copying the payload to drop the tag byte
+        return msgpack.unpackb(memoryview(payload)[1:], raw=False)
+    if tag == JSON_TAG:
+        return _json_loads(payload[1:])
+    if _is_msgpack(payload):
+        return msgpack.unpackb(payload, raw=False)
+    return _json_loads(payload)
+
+# Maximum number of queued messages flushed per pipeline by the background publisher
+PUBLISH_BATCH_SIZE = 64
+
+# How long the background publisher waits for a batch to fill before flushing it
+PUBLISH_FLUSH_INTERVAL_MS = 5
+
+# Longest a subscriber blocks waiting for a message (lets health checks run)
+SUBSCRIBE_POLL_TIMEOUT = 1.0
+
+# How long publish() trusts a "no receivers" result before publishing again
+RECEIVERS_CACHE_TTL = 1.0
+
 class SimplePubSub:
-    def __init__(self, redis_url: str = "redis://localhost:6379"):
-        """Initialize Redis PubSub wrapper with connection pooling for optimization."""
+    def __init__(self, redis_url: str = "redis://localhost:6379", serializer: str = "json"):
+        """
+        Initialize Redis PubSub wrapper with connection pooling for optimization.
+        
+        serializer selects the format of published messages: "json" (default,
+        readable by any client) or "msgpack" (smaller and faster to encode/decode
+        for in-house Python consumers; tagged with MSGPACK_TAG).
+        """
+        if serializer not in SERIALIZERS:
+            raise ValueError(f"Unsupported serializer: {serializer}")
+        self.serializer = serializer
+        self.redis_url = redis_url
+        
         try:
-            # Using connection pooling for better performance
-            self.redis = redis.Redis.from_url(redis_url, decode_responses=True)
+            # Using the shared connection pool for better performance
+            self.redis = redis.Redis(connection_pool=get_connection_pool(redis_url))
             self.redis.ping()  # Test connection
             logger.info("Redis connection established successfully")
         except Exception as e:
             logger.error(f"Failed to connect to Redis: {e}")
             raise
+        
+        # Optimization: Resolve the encoder, decoder and PUBLISH once, so the
+        # per-message path has no serializer branch or module/attribute lookups
+        if serializer == "msgpack":
+            self._dumps = _msgpack_dumps
+        else:
+            self._dumps = _json_dumps
+        self._loads = decode_message
+        self._publish = self.redis.publish
+        
+        # channel -> (receivers reported by the last PUBLISH, monotonic time)
+        self._receivers_cache: Dict[str, Tuple[int, float]] = {}
+        
+        # Fire-and-forget publishing: started lazily on first publish_async()
+        self._publish_queue: "queue.Queue[tuple]" = queue.Queue()
+        self._publisher_thread = None
+        self._publisher_lock = threading.Lock()
     
-    def publish(self, channel: str, data: Dict[str, Any]) -> bool:
+    def _encode(self, data: Message) -> bytes:
+        """
+        Serialize a message dict, dataclass or pydantic model to bytes.
+        
+        Optimization: orjson and msgpack are C extensions and emit bytes
+        that redis-py sends as-is. Pre-encoded bytes skip encoding entirely,
+        and pydantic models are dumped to JSON by pydantic-core in one pass
+        without building an intermediate dict.
+        """
+        if isinstance(data, bytes):
+            return data
+        if isinstance(data, BaseModel) and self.serializer == "json":
+            return data.model_dump_json().encode()
+        return self._dumps(data)
+    
+    def publish(self, channel: str, data: Message, flush: bool = True) -> bool:
         """
         Publish message to Redis channel.
         
         Optimization: Using JSON serialization instead of pickle for better performance
         and cross-language compatibility.
+        
+        With flush=True (default) the PUBLISH is sent immediately and the result
+        says whether any subscriber received it. High-rate producers can pass
+        flush=False to hand the message to the background batcher instead (see
+        publish_async); the result then only says it was queued.
+        """
+        if not flush:
+            return self.publish_async(channel, data)
+        
+        # Optimization: A channel nobody listened to a moment ago is skipped
+        # without serializing or sending the message
+        if self._recently_unheard(channel):
+            return False
+        
+        try:
+            message = self._encode(data)
+        except Exception as e:
+            logger.error(f"Failed to publish message to {channel}: {e}")
+            return False
+        return self._send(channel, message)
+    
+    def publish_raw(self, channel: str, payload: bytes) -> bool:
+        """
+        Publish an already-serialized payload to a Redis channel.
+        
+        Optimization: No model, dict or encoder on the path at all. Producers
+        of many similar events can serialize a template once and patch only the
+        changing bytes (e.g. a timestamp) per message. The payload must be in a
+        format decode_message understands (JSON, or tagged msgpack).
         """
+        if self._recently_unheard(channel):
+            return False
+        return self._send(channel, payload)
+    
+    def _recently_unheard(self, channel: str) -> bool:
+        """True if the last PUBLISH to channel, under RECEIVERS_CACHE_TTL ago, reached nobody."""
+        cached = self._receivers_cache.get(channel)
+        if cached is not None and cached[0] == 0 and time.monotonic() - cached[1] < RECEIVERS_CACHE_TTL:
+            logger.debug("Skipped publish to %s: no receivers", channel)
+            return True
+        return False
+    
+    def _send(self, channel: str, message: bytes) -> bool:
+        """PUBLISH encoded bytes and remember how many receivers got them."""
         try:
-            message = json.dumps(data)
-            result = self.redis.publish(channel, message)
-            logger.info(f"Published message to {channel}: {data}")
+            result = self._publish(channel, message)
+            self._receivers_cache[channel] = (result, time.monotonic())
+            # Optimization: Lazy formatting and no payload in the message - nothing
+            # is stringified unless DEBUG logging is enabled
+            logger.debug("Published message to %s (%d receivers)", channel, result)
             return result > 0
         except Exception as e:
             logger.error(f"Failed to publish message to {channel}: {e}")
             return False
     
+    def publish_many(self, channel: str, messages: Iterable[Message]) -> int:
+        """
+        Publish a batch of messages to a Redis channel in a single round-trip.
+        
+        Optimization: Pipelining (transaction=False) sends every PUBLISH in one
+        network write and reads all replies at once instead of paying one RTT
+        per message.
+        
+        Returns the number of messages that reached at least one subscriber.
+        """
+        try:
+            pipe = self.redis.pipeline(transaction=False)
+            for data in messages:
+                pipe.publish(channel, self._encode(data))
+            results = pipe.execute()
+            delivered = sum(1 for receivers in results if receivers > 0)
+            logger.info(f"Published {len(results)} messages to {channel} ({delivered} delivered)")
+            return delivered
+        except Exception as e:
+            logger.error(f"Failed to publish batch to {channel}: {e}")
+            return 0
+    
+    def publish_async(self, channel: str, data: Message) -> bool:
+        """
+        Queue a message for fire-and-forget publishing.
+        
+        Optimization: The caller never waits for the PUBLISH reply. A daemon
+        publisher thread coalesces queued messages until PUBLISH_BATCH_SIZE are
+        collected or PUBLISH_FLUSH_INTERVAL_MS has passed, then flushes the
+        batch through a single pipeline, discarding the replies.
+        
+        Returns True once the message is queued.
+        """
+        try:
+            message = self._encode(data)
+        except (TypeError, ValueError) as e:
+            logger.error(f"Failed to encode message for {channel}: {e}")
+            return False
+        
+        self._ensure_publisher()
+        self._publish_queue.put((channel, message))
+        return True
+    
+    def flush(self) -> None:
+        """Block until every queued message has been handed to Redis."""
+        if self._publisher_thread is not None:
+            self._publish_queue.join()
+    
+    def _ensure_publisher(self) -> None:
+        """Start the background publisher thread if it is not running yet."""
+        if self._publisher_thread is not None:
+            return
+        with self._publisher_lock:
+            if self._publisher_thread is None:
+                self._publisher_thread = threading.Thread(
+                    target=self._publisher_loop,
+                    name="pubsub-publisher",
+                    daemon=True
+                )
+                self._publisher_thread.start()
+    
+    def _publisher_loop(self) -> None:
+        """Drain the publish queue, flushing a pipeline on batch size or interval."""
+        flush_interval = PUBLISH_FLUSH_INTERVAL_MS / 1000
+        while True:
+            batch = [self._publish_queue.get()]
+            deadline = time.monotonic() + flush_interval
+            while len(batch) < PUBLISH_BATCH_SIZE:
+                remaining = deadline - time.monotonic()
+                try:
+                    if remaining > 0:
+                        batch.append(self._publish_queue.get(timeout=remaining))
+                    else:
+                        batch.append(self._publish_queue.get_nowait())
+                except queue.Empty:
+                    break
+            
+            try:
+                pipe = self.redis.pipeline(transaction=False)
+                for channel, message in batch:
+                    pipe.publish(channel, message)
+                pipe.execute(raise_on_error=False)
+                logger.debug("Flushed %d queued messages", len(batch))
+            except Exception as e:
+                logger.error(f"Failed to flush {len(batch)} queued messages: {e}")
+            finally:
+                for _ in batch:
+                    self._publish_queue.task_done()
+    
     def subscribe(self, channel: str, callback: Callable[[Dict[str, Any]], None]) -> None:
         """
         Subscribe to Redis channel and process messages.
         
-        Optimization: Using pubsub() context manager for automatic cleanup
-        and efficient message processing.
+        Optimization: Plain SUBSCRIBE on the exact channel (never PSUBSCRIBE),
+        so Redis delivers by direct channel lookup without pattern matching.
+        Subscription confirmations are dropped inside redis-py.
+        
+        Optimization: Blocks in get_message() only while the socket is idle;
+        once a message arrives, everything already buffered is drained with
+        non-blocking reads before waiting again, instead of re-entering the
+        listen() generator and its select() per message.
         """
         try:
-            pubsub = self.redis.pubsub()
+            pubsub = self.redis.pubsub(ignore_subscribe_messages=True)
             pubsub.subscribe(channel)
             logger.info(f"Subscribed to channel: {channel}")
             
-            # Skip the subscription confirmation message
-            pubsub.get_message()
-            
-            for message in pubsub.listen():
-                if message['type'] == 'message':
+            get_message = pubsub.get_message
+            loads = self._loads
+            while True:
+                message = get_message(timeout=SUBSCRIBE_POLL_TIMEOUT)
+                while message is not None:
+                    # Decode and dispatch in separate trys so a ValueError
+                    # raised by the callback is not reported as a decode failure
                     try:
-                        data = json.loads(message['data'])
-                        callback(data)
-                    except json.JSONDecodeError as e:
-                        logger.error(f"Failed to decode message: {e}")
+                        data = loads(message['data'])
                     except Exception as e:
-                        logger.error(f"Error processing message: {e}")
+                        logger.error(f"Failed to decode message: {e}")
+                    else:
+                        try:
+                            callback(data)
+                        except Exception as e:
+                            logger.error(f"Error processing message: {e}")
+                    message = get_message(timeout=0.0)
                         
         except Exception as e:
-            logger.error(f"Error in subscription to {channel}: {e}") 
\ No newline at end of file
+            logger.error(f"Error in subscription to {channel}: {e}")
+    
+    async def asubscribe(
+        self,
+        channel: str,
+        callback: Callable[[Dict[str, Any]], Optional[Awaitable[None]]]
+    ) -> None:
+        """
+        Subscribe to a Redis channel from an asyncio event loop.
+        
+        Optimization: Waits on the event loop instead of a dedicated thread, so
+        one loop can serve many channels (one asubscribe task each). callback
+        may be a plain function or a coroutine function.
+        
+        Uses its own asyncio client: connection pools are bound to the loop
+        that created them and cannot be shared with the sync pool.
+        """
+        client = aioredis.Redis.from_url(self.redis_url, **_CONNECTION_OPTIONS)
+        pubsub = client.pubsub(ignore_subscribe_messages=True)
+        loads = self._loads
+        try:
+            await pubsub.subscribe(channel)
+            logger.info(f"Subscribed to channel (async): {channel}")
+            
+            while True:
+                message = await pubsub.get_message(timeout=SUBSCRIBE_POLL_TIMEOUT)
+                if message is None:
+                    continue
+                try:
+                    data = loads(message['data'])
+                except Exception as e:
+                    logger.error(f"Failed to decode message: {e}")
+                    continue
+                try:
+                    result = callback(data)
+                    if inspect.isawaitable(result):
+                        await result
+                except Exception as e:
+                    logger.error(f"Error processing message: {e}")
+                    
+        except Exception as e:
+            logger.error(f"Error in async subscription to {channel}: {e}")
+        finally:
+            await pubsub.aclose()
+            await client.aclose()
@@ -3,22 +3,36 @@
 בדיקת Redis connection ו-PubSub
 """
 
-import sys
-import os
 import redis
-import json
+import orjson
 import time
-from datetime import datetime
 
-sys.path.append(os.path.join(os.path.dirname(__file__), 'shared'))
 from shared.config import settings
+from shared.models import now_ms
+from shared.pubsub import get_connection_pool
+
+# הודעת בדיקה מסודרת מראש - השדות הקבועים מקודדים פעם אחת ורק timestamp_ms מוחלף
+TIMESTAMP_PLACEHOLDER = b'"__TS__"'
+TEST_MESSAGE_TEMPLATE = orjson.dumps({
+    "symbol": "TEST",
+    "price": 100.0,
+    "change_percent": 8.0,
+    "volume": 500000,
+    "timestamp_ms": "__TS__"
+})
+
+def build_test_payload(timestamp_ms=None):
+    """הודעת market event לבדיקה כ-bytes מוכנים לפרסום"""
+    timestamp_ms = timestamp_ms or now_ms()
+    return TEST_MESSAGE_TEMPLATE.replace(TIMESTAMP_PLACEHOLDER, str(timestamp_ms).encode())
 
 def test_redis_basic():
     """בדיקת Redis connection בסיסי"""
     print("🔍 בודק Redis connection...")
     
     try:
-        r = redis.Redis.from_url(settings.redis_url)
+        # אותו connection pool משותף שמשמש את SimplePubSub - בלי handshake נוסף
+        r = redis.Redis(connection_pool=get_connection_pool(settings.redis_url))
         result = r.ping()
         print(f"✅ Redis ping: {result}")
         return r
@@ -32,15 +46,7 @@ def test_pubsub_publish(r):
     
     try:
         # פרסום הודעת בדיקה
-        test_message = {
-            "symbol": "TEST",
-            "price": 100.0,
-            "change_percent": 8.0,
-            "volume": 500000,
-            "timestamp": datetime.now().isoformat()
-        }
-        
-        result = r.publish('market_events', json.dumps(test_message))
+        result = r.publish('market_events', build_test_payload())
         print(f"✅ פרסמתי market_events ל-{result} subscribers")
         
         if result == 0:
@@ -65,16 +71,18 @@ def test_pubsub_subscribe(r):
         print('redis-cli PUBLISH market_events \'{"symbol":"TEST","price":100}\'')
         print("⏰ מחכה 10 שניות להודעות...")
         
-        # מחכה להודעות
-        start_time = time.time()
-        while time.time() - start_time < 10:
-            message = pubsub.get_message(timeout=1)
-            if message:
+        # מחכה להודעות עד deadline - חוסם עם הזמן שנותר (זיהוי מיידי כשהודעה מגיעה)
+        # ומרוקן את כל מה שכבר ממתין בלי לחסום שוב
+        deadline = time.monotonic() + 10
+        while (remaining := deadline - time.monotonic()) > 0:
+            message = pubsub.get_message(timeout=remaining)
+            while message:
                 if message['type'] == 'subscribe':
                     print(f"✅ הירשמתי לערוץ {message['channel']}")
                 elif message['type'] == 'message':
                     print(f"📨 קיבלתי הודעה: {message['data']}")
                     return True
+                message = pubsub.get_message(timeout=0.0)
         
         print("⚠️  לא קיבלתי הודעות תוך 10 שניות")
         return False
@@ -88,9 +96,6 @@ def test_news_analyzer_connection():
     print("\n🔍 בודק News Analyzer connection...")
     
     try:
-        # ייבוא מודולים של News Analyzer
-        sys.path.append(os.path.join(os.path.dirname(__file__), 'services', 'news_analyzer'))
-        
         from shared.pubsub import SimplePubSub
         
         # יצירת connection כמו בNews Analyzer
@@ -138,5 +143,5 @@ if __name__ == "__main__":
         
     print("\n📝 עזרה:")
     print("1. וודא שRedis רץ: docker-compose up redis")
-    print("2. וודא שNews Analyzer רץ: python services/news_analyzer/app.py")
+    print("2. וודא שNews Analyzer רץ: python -m services.news_analyzer.app")
     print("3. הפעל: python test_redis.py") 
\ No newline at end of file
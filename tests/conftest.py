@@ -0,0 +1,14 @@
+"""Shared test setup: point every SimplePubSub at an in-memory fakeredis server."""
+import fakeredis
+import redis
+
+import shared.pubsub as pubsub
+
+_FAKE_POOL = redis.ConnectionPool(
+    connection_class=getattr(fakeredis, "FakeRedisConnection", None) or fakeredis.FakeConnection,
+    server=fakeredis.FakeServer()
+)
+
+# Patched before any service module is imported - their module-level
+# singletons connect to Redis at import time
+pubsub.get_connection_pool = lambda redis_url: _FAKE_POOL
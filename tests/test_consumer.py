@@ -0,0 +1,91 @@
+"""Tests for NewsConsumer deduplication across concurrent batch workers."""
+import threading
+
+import pytest
+
+from services.news_analyzer import consumer as consumer_module
+from shared.models import NewsData
+
+ARTICLE = NewsData(
+    headline="Apple shares surge on strong earnings",
+    summary="Record quarter beats estimates",
+    url="https://example.com/aapl",
+    datetime=0,
+    source="test"
+)
+
+def _event(symbol="AAPL"):
+    return {"symbol": symbol, "price": 150.0, "change_percent": 8.0, "volume": 500000, "timestamp_ms": 0}
+
+@pytest.fixture
+def news_consumer(monkeypatch):
+    news_consumer = consumer_module.NewsConsumer()
+    published = []
+    monkeypatch.setattr(
+        news_consumer.pubsub, "publish_async",
+        lambda channel, data: published.append((channel, data)) or True
+    )
+    news_consumer.published = published
+    yield news_consumer
+    news_consumer._executor.shutdown(wait=True)
+
+def test_overlapping_batches_fetch_and_alert_once(news_consumer, monkeypatch):
+    fetch_started = threading.Event()
+    release_fetch = threading.Event()
+    fetched = []
+    
+    def slow_fetch(symbols, days_back=1):
+        fetched.append(list(symbols))
+        fetch_started.set()
+        release_fetch.wait(timeout=5)
+        return {symbol: [ARTICLE] for symbol in symbols}
+    
+    monkeypatch.setattr(consumer_module.finnhub_fetcher, "get_company_news_many", slow_fetch)
+    
+    first = news_consumer._executor.submit(news_consumer._process_batch, [_event()])
+    assert fetch_started.wait(timeout=5)
+    # Second burst arrives while the first is still fetching on another worker
+    second = news_consumer._executor.submit(news_consumer._process_batch, [_event()])
+    second.result(timeout=5)
+    release_fetch.set()
+    first.result(timeout=5)
+    
+    assert fetched == [["AAPL"]]
+    assert len(news_consumer.published) == 1
+    assert news_consumer.published[0][0] == "news_alerts"
+
+def test_failed_fetch_releases_claim(news_consumer, monkeypatch):
+    calls = []
+    
+    def failing_fetch(symbols, days_back=1):
+        calls.append(list(symbols))
+        if len(calls) == 1:
+            raise RuntimeError("Finnhub unavailable")
+        return {symbol: [ARTICLE] for symbol in symbols}
+    
+    monkeypatch.setattr(consumer_module.finnhub_fetcher, "get_company_news_many", failing_fetch)
+    
+    news_consumer._process_batch([_event()])
+    assert news_consumer.published == []
+    
+    news_consumer._process_batch([_event()])
+    assert calls == [["AAPL"], ["AAPL"]]
+    assert len(news_consumer.published) == 1
+    
+    # Now within the dedup window
+    news_consumer._process_batch([_event()])
+    assert len(calls) == 2
+
+def test_changing_thresholds_rebuilds_the_filter(news_consumer):
+    assert news_consumer._should_process_event(_event("MSFT"))
+    news_consumer._release_claims(("MSFT",))
+    
+    news_consumer.min_change_percent = 10.0
+    assert not news_consumer._should_process_event(_event("MSFT"))  # 8% move
+    
+    news_consumer.min_change_percent = 3.0
+    news_consumer._mark_processed("MSFT")
+    assert not news_consumer._should_process_event(_event("MSFT"))
+    
+    news_consumer.dedup_window = 0
+    assert news_consumer._should_process_event(_event("MSFT"))
@@ -0,0 +1,69 @@
+"""Tests for FinnhubNewsFetcher."""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from services.news_analyzer.news_fetcher import MAX_CONCURRENT_REQUESTS, FinnhubNewsFetcher
+
+def test_null_article_fields_are_coerced():
+    articles = [
+        {"headline": None, "summary": None, "url": None, "datetime": None, "source": None},
+        {"headline": "Beat estimates", "summary": "Q3", "url": "u", "datetime": 1, "source": "s"},
+        "not an article",
+    ]
+    
+    news = FinnhubNewsFetcher._to_news_data(articles)
+    
+    assert len(news) == 2
+    assert (news[0].headline, news[0].summary, news[0].url, news[0].datetime, news[0].source) == ("", "", "", 0, "")
+    assert news[1].headline == "Beat estimates"
+
+def test_concurrent_bulk_fetches_share_the_request_cap(monkeypatch):
+    fetcher = FinnhubNewsFetcher()
+    fetcher.min_call_interval = 0
+    lock = threading.Lock()
+    in_flight = [0, 0]  # current, peak
+    
+    def slow_get(url, **kwargs):
+        with lock:
+            in_flight[0] += 1
+            in_flight[1] = max(in_flight[1], in_flight[0])
+        time.sleep(0.02)
+        with lock:
+            in_flight[0] -= 1
+        response = requests.Response()
+        response.status_code = 200
+        response._content = b"[]"
+        return response
+    
+    monkeypatch.setattr(fetcher.session, "get", slow_get)
+    
+    batches = [[f"S{batch}{i}" for i in range(MAX_CONCURRENT_REQUESTS)] for batch in range(3)]
+    with ThreadPoolExecutor(max_workers=len(batches)) as executor:
+        list(executor.map(fetcher.get_company_news_many, batches))
+    
+    assert in_flight[1] <= MAX_CONCURRENT_REQUESTS
+    assert fetcher.api_calls_count == 3 * MAX_CONCURRENT_REQUESTS
+
+def test_market_news_304_does_not_reuse_a_smaller_limit(monkeypatch):
+    fetcher = FinnhubNewsFetcher()
+    fetcher.min_call_interval = 0
+    articles = b'[{"headline": "a"}, {"headline": "b"}, {"headline": "c"}]'
+    
+    def conditional_get(url, headers=None, **kwargs):
+        response = requests.Response()
+        response.headers["ETag"] = '"v1"'
+        if headers and headers.get("If-None-Match") == '"v1"':
+            response.status_code = 304
+        else:
+            response.status_code = 200
+            response._content = articles
+        return response
+    
+    monkeypatch.setattr(fetcher.session, "get", conditional_get)
+    
+    assert len(fetcher.get_market_news(limit=1)) == 1
+    fetcher.news_cache.clear()  # TTL expired - the next call revalidates
+    assert len(fetcher.get_market_news(limit=3)) == 3
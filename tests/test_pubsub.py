@@ -0,0 +1,82 @@
+"""Tests for SimplePubSub message dispatch."""
+import asyncio
+import logging
+import threading
+import time
+import warnings
+
+import fakeredis
+import fakeredis.aioredis
+import pytest
+
+import shared.pubsub as pubsub
+from shared.pubsub import SimplePubSub
+
+def _wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return condition()
+
+def test_callback_errors_are_not_reported_as_decode_failures(caplog):
+    ps = SimplePubSub("redis://fake")
+    received = []
+    
+    def callback(data):
+        received.append(data)
+        raise ValueError("bad payload")
+    
+    threading.Thread(target=ps.subscribe, args=("test_dispatch", callback), daemon=True).start()
+    assert _wait_for(lambda: ps.redis.pubsub_numsub("test_dispatch")[0][1] > 0)
+    
+    with caplog.at_level(logging.ERROR, logger="shared.pubsub"):
+        ps.redis.publish("test_dispatch", b"not json")
+        ps.publish("test_dispatch", {"symbol": "ABC"})
+        assert _wait_for(lambda: "Error processing message" in caplog.text)
+    
+    assert received == [{"symbol": "ABC"}]
+    assert caplog.text.count("Failed to decode message") == 1
+    assert "Error processing message: bad payload" in caplog.text
+
+def test_asubscribe_decodes_awaits_callback_and_closes_on_cancel(monkeypatch, caplog):
+    client = fakeredis.aioredis.FakeRedis(server=fakeredis.FakeServer())
+    opened = []
+    open_pubsub = client.pubsub
+    
+    def tracking_pubsub(**kwargs):
+        opened.append(open_pubsub(**kwargs))
+        return opened[-1]
+    
+    monkeypatch.setattr(client, "pubsub", tracking_pubsub)
+    monkeypatch.setattr(pubsub.aioredis.Redis, "from_url", lambda url, **kwargs: client)
+    
+    async def run():
+        received = []
+        done = asyncio.Event()
+        
+        async def callback(data):
+            await asyncio.sleep(0)
+            received.append(data)
+            done.set()
+        
+        task = asyncio.create_task(SimplePubSub("redis://fake").asubscribe("test_async", callback))
+        while (await client.pubsub_numsub("test_async"))[0][1] == 0:
+            await asyncio.sleep(0.01)
+        
+        await client.publish("test_async", b"not json")
+        await client.publish("test_async", b'{"symbol": "ABC"}')
+        await asyncio.wait_for(done.wait(), timeout=5)
+        
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        return received
+    
+    with warnings.catch_warnings(record=True) as caught, caplog.at_level(logging.ERROR, logger="shared.pubsub"):
+        warnings.simplefilter("always", DeprecationWarning)
+        received = asyncio.run(run())
+    
+    assert received == [{"symbol": "ABC"}]
+    assert caplog.text.count("Failed to decode message") == 1
+    assert opened and opened[0].connection is None  # pubsub released on cancel
+    assert not [w for w in caught if "aclose" in str(w.message)]
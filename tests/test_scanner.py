@@ -0,0 +1,45 @@
+"""Tests for StockScanner change tracking between scans."""
+import pytest
+
+from services.market_scanner.scanner import PRICE_EPSILON, StockScanner
+
+def _gainers(price):
+    return {"top_gainers": [{
+        "ticker": "ABC",
+        "price": f"{price:.3f}",
+        "change_amount": "1.0",
+        "change_percentage": "12.5%",
+        "volume": "1000000"
+    }]}
+
+@pytest.fixture
+def scanner(monkeypatch):
+    scanner = StockScanner()
+    published = []
+    monkeypatch.setattr(
+        scanner.pubsub, "publish_async",
+        lambda channel, event: published.append(event) or True
+    )
+    scanner.published = published
+    return scanner
+
+def test_creeping_price_drift_is_republished(scanner, monkeypatch):
+    step = 0.008
+    assert step < PRICE_EPSILON
+    prices = [round(10.0 + step * i, 3) for i in range(6)]  # 10.000 -> 10.040
+    
+    for price in prices:
+        monkeypatch.setattr(scanner, "get_top_gainers", lambda price=price: _gainers(price))
+        scanner.process_and_publish_gainers()
+    
+    published_prices = [event.price for event in scanner.published]
+    # 10.016 is the first price more than PRICE_EPSILON away from 10.0,
+    # and 10.032 the first one that far from 10.016
+    assert published_prices == [10.0, 10.016, 10.032]
+
+def test_unchanged_ticker_is_not_republished(scanner, monkeypatch):
+    for price in (10.0, 10.005, 10.0):
+        monkeypatch.setattr(scanner, "get_top_gainers", lambda price=price: _gainers(price))
+        scanner.process_and_publish_gainers()
+    
+    assert [event.price for event in scanner.published] == [10.0]